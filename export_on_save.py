@@ -10,8 +10,9 @@ Features:
 
 import json
 import os
-from functools import partial
-from typing import Dict, List, Optional
+import struct
+import time
+from pathlib import Path
 import PySide6.QtWidgets as QtWidgets
 import PySide6.QtCore as QtCore
 import PySide6.QtGui as QtGui
@@ -24,13 +25,57 @@ import substance_painter.export
 import substance_painter.logging
 import substance_painter.ui
 import substance_painter.project
-import substance_painter.resource
 import substance_painter.textureset
-import substance_painter.js
+
+# substance_painter.js is only needed when building the export config, import it on first use
+_js = None
+
+def _get_js():
+	global _js
+	if _js is None:
+		import substance_painter.js as _js
+	return _js
+
+# Javascript returning export path, export preset and export options as a JSON string.
+# `substance_painter.js` has no way to precompile a script, so the source is at least built only once
+_EXPORT_QUERY_JS = (
+	"(function() {"
+	" var o = alg.mapexport.getProjectExportOptions();"
+	" return JSON.stringify({"
+	"  path: alg.mapexport.exportPath(),"
+	"  preset: alg.mapexport.getProjectExportPreset(),"
+	"  o: {fileFormat: o.fileFormat, padding: o.padding, dilation: o.dilation, bitDepth: o.bitDepth, exportShaderParams: o.exportShaderParams}"
+	" });"
+	"})()"
+)
+
+# orjson is used when available, otherwise fall back to the standard json module.
+# _dumps() pretty-prints, it is only used for the debug info dump
+try:
+	import orjson
+
+	def _dumps(obj):
+		return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+
+	_loads = orjson.loads
+except ImportError:
+	def _dumps(obj):
+		return json.dumps(obj, indent=2, ensure_ascii=False)
+
+	_loads = json.loads
 
 # Plugin settings
 PLUGIN_NAME = "Export on Save"
-SETTINGS_FILE = "export_on_save_settings.json"
+_PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+SETTINGS_FILE = "export_on_save_settings.bin"
+SETTINGS_PATH = os.path.join(_PLUGIN_DIR, SETTINGS_FILE)
+# Settings file used before the binary format, migrated on first load
+LEGACY_SETTINGS_PATH = os.path.join(_PLUGIN_DIR, "export_on_save_settings.json")
+# Default for `Debug - Verbose Logging`, which logs the list of exported files after each export,
+# set the EXPORT_ON_SAVE_DEBUG environment variable to enable
+VERBOSE = bool(os.environ.get("EXPORT_ON_SAVE_DEBUG"))
+# (st_mtime_ns, parsed settings) of the last settings file read
+_SETTINGS_CACHE: tuple[int, dict] | None = None
 
 class _ActionUnlock():
 	"""Action to unlock the project
@@ -51,6 +96,24 @@ class _ActionUnlock():
 class ExportOnSaveMenu(QtWidgets.QMenu):
 	"""Main plugin menu control"""
 
+	# Shape of the config passed to `substance_painter.export.export_project_textures()`,
+	# every field is filled by build_export_config()
+	_CFG_TEMPLATE = {
+		"exportShaderParams": None,
+		"defaultExportPreset": None,
+		"exportPath": None,
+		"exportList": None,
+		"exportParameters": [{
+			"parameters": {
+				"fileFormat": None,
+				"bitDepth": None,
+				"dithering": None,
+				"paddingAlgorithm": None,
+				"dilationDistance": None,
+			}
+		}]
+	}
+
 	def __init__(self):
 		super().__init__(PLUGIN_NAME)
 		self.setObjectName("ExportOnSaveMenu")
@@ -58,9 +121,54 @@ class ExportOnSaveMenu(QtWidgets.QMenu):
 		# Settings variables
 		self.enabled = False
 
+		# Last built export config, keyed by the raw javascript export query result
+		self._cfg_cache: dict | None = None
+		self._cfg_key = None
+
+		# Settings writes are coalesced by a short single shot timer, see save_settings()
+		self._save_timer = QtCore.QTimer(self)
+		self._save_timer.setSingleShot(True)
+		self._save_timer.setInterval(500)
+		self._save_timer.timeout.connect(self._flush_settings)
+		self._settings_dirty = False
+		# `enabled` as last read from or written to the settings file, None if unknown
+		self._last_saved_enabled = None
+
+		# (texture set name, raw javascript export query result) of the last successful export,
+		# and whether the project had unsaved changes when it was last saved
+		self._last_export_signature = None
+		self._project_modified = True
+
+		# Set while execute_export() runs, so that exports never overlap
+		self._export_in_flight = False
+
+		# Log the list of exported files after each export
+		self._log_verbose = VERBOSE
+
+		# The menu actions are only created the first time the menu is opened,
+		# until then the status text is just kept here, see _set_status()
+		self._status_text = "Status: Ready"
+		self._menu_built = False
+		self._debug_menu_built = False
+
 		self.load_settings()
+		self.aboutToShow.connect(self._build_menu_once)
+
+	def _build_menu_once(self):
+		"""Build menu structure on first show"""
+		if self._menu_built:
+			return
+		self._menu_built = True
 		self.init_menu()
 
+	def _set_status(self, text):
+		"""Set the status text, shown by the status action once the menu is built"""
+		if text == self._status_text:
+			return
+		self._status_text = text
+		if self._menu_built:
+			self.status_action.setText(text)
+
 	def init_menu(self):
 		"""Initialize menu structure"""
 
@@ -73,23 +181,48 @@ class ExportOnSaveMenu(QtWidgets.QMenu):
 
 		self.addSeparator()
 
+		# Force Export action
+		self.force_action = QtGui.QAction("Force Export")
+		self.force_action.setToolTip("Export currently active texture set even if nothing changed since the last export")
+		self.force_action.triggered.connect(self.force_export)
+		self.addAction(self.force_action)
+
+		# Debug submenu, its actions are only created the first time it is opened
+		self.debug_menu = self.addMenu("Debug")
+		self.debug_menu.aboutToShow.connect(self._build_debug_menu_once)
+
+		self.addSeparator()
+
+		# Status display (as a disabled action to show status)
+		self.status_action = QtGui.QAction(self._status_text)
+		self.status_action.setEnabled(False)
+		self.addAction(self.status_action)
+
+	def _build_debug_menu_once(self):
+		"""Build debug submenu structure on first show"""
+		if self._debug_menu_built:
+			return
+		self._debug_menu_built = True
+
 		# Manual Export Test action
 		self.test_action = QtGui.QAction("Manual Export Test")
+		self.test_action.setEnabled(not self._export_in_flight)
 		self.test_action.triggered.connect(self.manual_export_test)
-		self.addAction(self.test_action)
+		self.debug_menu.addAction(self.test_action)
 
 		# Debug info action
 		self.debug_action = QtGui.QAction("Show Debug Info")
 		self.debug_action.setToolTip("Show debug information for currently active texture set")
 		self.debug_action.triggered.connect(self.show_debug_info)
-		self.addAction(self.debug_action)
-
-		self.addSeparator()
-
-		# Status display (as a disabled action to show status)
-		self.status_action = QtGui.QAction("Status: Ready")
-		self.status_action.setEnabled(False)
-		self.addAction(self.status_action)
+		self.debug_menu.addAction(self.debug_action)
+
+		# Verbose logging toggle action
+		self.verbose_action = QtGui.QAction("Verbose Logging")
+		self.verbose_action.setToolTip("Log the list of exported files after each export")
+		self.verbose_action.setCheckable(True)
+		self.verbose_action.setChecked(self._log_verbose)
+		self.verbose_action.triggered.connect(self.on_verbose_changed)
+		self.debug_menu.addAction(self.verbose_action)
 	
 
 	def on_enabled_changed(self, checked):
@@ -97,21 +230,35 @@ class ExportOnSaveMenu(QtWidgets.QMenu):
 		self.enabled = checked
 		self.save_settings()
 
+		# Saves made while disabled were not exported, so the next save must not be skipped
+		if self.enabled:
+			self.forget_last_export()
+
 		status = "Enabled" if self.enabled else "Disabled"
-		self.status_action.setText(f"Status: Auto Export {status}")
+		self._set_status(f"Status: Auto Export {status}")
 
 		substance_painter.logging.info(f"[{PLUGIN_NAME}] Auto export feature {status.lower()}")
 
 
+	def on_verbose_changed(self, checked):
+		"""Callback when verbose logging state changes"""
+		self._log_verbose = checked
+
 	def show_debug_info(self):
 		"""Show debug information"""
 		try:
 			substance_painter.logging.info(f"[{PLUGIN_NAME}] === Debug Info ===")
 			substance_painter.logging.info(f"[{PLUGIN_NAME}] Enabled state: {self.enabled}")
 
+			texture_set_name = self._active_texture_set_name() if substance_painter.project.is_open() else None
+			substance_painter.logging.info(f"[{PLUGIN_NAME}] Active texture set: {texture_set_name}")
+
 			# Show currently build config
-			export_config = self.build_export_config()
-			substance_painter.logging.info(f"[{PLUGIN_NAME}] Build config: {json.dumps(export_config, indent=2, ensure_ascii=False)}")
+			export_config = self.build_export_config(texture_set_name)
+			if export_config is None:
+				substance_painter.logging.info(f"[{PLUGIN_NAME}] Build config: none")
+			else:
+				substance_painter.logging.info(f"[{PLUGIN_NAME}] Build config: {_dumps(export_config)}")
 
 			substance_painter.logging.info(f"[{PLUGIN_NAME}] === Debug Info End ===")
 
@@ -119,85 +266,143 @@ class ExportOnSaveMenu(QtWidgets.QMenu):
 			substance_painter.logging.error(f"[{PLUGIN_NAME}] Failed to show debug info: {str(e)}")
 	
 	def manual_export_test(self):
-		"""Manual export test"""
+		"""Manual export test, same as `Force Export`"""
+		self.force_export()
+
+	def force_export(self):
+		"""Export without checking whether anything changed since the last export"""
 		if not substance_painter.project.is_open():
-			self.status_action.setText("Status: No project open")
+			self._set_status("Status: No project open")
 			return
 
-		substance_painter.logging.info(f"[{PLUGIN_NAME}] Manual export test started")
-		self.execute_export()
-		substance_painter.logging.info(f"[{PLUGIN_NAME}] Manual export test completed")
+		substance_painter.logging.info(f"[{PLUGIN_NAME}] Force export started")
+		self.execute_export(force=True)
+		substance_painter.logging.info(f"[{PLUGIN_NAME}] Force export completed")
 
 
-	def execute_export(self):
-		"""Execute export operation"""
+	def execute_export(self, force=False):
+		"""Execute export operation
+		Unless `force` is set, the export is skipped when the project had no unsaved changes
+		and the texture set and export settings are the same as in the last export.
+		"""
+		if self._export_in_flight:
+			substance_painter.logging.warning(f"[{PLUGIN_NAME}] An export is already running, skipped")
+			return
+
+		self._export_in_flight = True
+		self._set_export_actions_enabled(False)
 		try:
 			# Make build config
 			export_config = self.build_export_config()
-			substance_painter.logging.info(f"[{PLUGIN_NAME}] Build config: {json.dumps(export_config, indent=2, ensure_ascii=False)}")
+			if export_config is None:
+				return
 
-			self.status_action.setText("Status: Exporting...")
-			
-			# Record texture sets to be exported
-			texture_set_names = [item["rootPath"] for item in export_config["exportList"]]
+			# The raw export query result covers export path, preset and every export option
+			export_signature = (export_config["exportList"][0]["rootPath"], self._cfg_key)
+			if not force and not self._project_modified and export_signature == self._last_export_signature:
+				self._set_status("Status: Export skipped (no changes)")
+				substance_painter.logging.info(f"[{PLUGIN_NAME}] Export skipped - no changes since the last export")
+				return
+
+			# Record texture set to be exported, the export list only ever holds the active one
+			export_parameters = export_config["exportParameters"][0]["parameters"]
 			substance_painter.logging.info(
-				f"[{PLUGIN_NAME}] Preparing to export texture sets: {', '.join(texture_set_names)}"
+				f"[{PLUGIN_NAME}] Exporting texture set '{export_signature[0]}' to {export_config['exportPath']}"
+				f" as {export_parameters['fileFormat']}/{export_parameters['bitDepth']}bit"
 			)
+
+			self._set_status("Status: Exporting...")
 			
 			# Execute export
 			result = substance_painter.export.export_project_textures(export_config)
+			self.on_export_finished(result, export_config, export_signature)
 
+		except Exception as e:
+			self._set_status(f"Status: Export exception - {str(e)}")
+			self.forget_last_export()
+			substance_painter.logging.error(f"[{PLUGIN_NAME}] Exception occurred during export: {str(e)}")
+		finally:
+			self._export_in_flight = False
+			self._set_export_actions_enabled(True)
+
+	def _set_export_actions_enabled(self, enabled):
+		"""Enable/disable the actions that start an export"""
+		if self._menu_built:
+			self.force_action.setEnabled(enabled)
+		if self._debug_menu_built:
+			self.test_action.setEnabled(enabled)
+
+	def on_export_finished(self, result, export_config, export_signature):
+		"""Report the result of an export
+		Kept apart from execute_export() so that it can serve as a completion callback.
+		Note that the export itself cannot be moved off the main thread:
+		the substance painter python API must only be called from the main thread.
+		"""
+		try:
 			if result.status == substance_painter.export.ExportStatus.Success:
-				# Count exported files
-				file_count = sum(len(files) for files in result.textures.values())
+				# Count exported files and build the per texture set summary in a single pass
+				file_count = 0
+				summary = []
+				lines = []
+				for (texture_set, stack), files in result.textures.items():
+					file_count += len(files)
+					summary.append(f"{texture_set}:{len(files)}")
+					if self._log_verbose:
+						lines.append(f"  '{texture_set}' -> {', '.join(files)}")
 
-				self.status_action.setText(f"Status: Export successful ({file_count} files)")
+				self._set_status(f"Status: Export successful ({file_count} files)")
+				self._last_export_signature = export_signature
 
 				substance_painter.logging.info(
 					f"[{PLUGIN_NAME}] Successfully exported {file_count} texture files to {export_config['exportPath']}"
+					f" ({', '.join(summary)})"
 				)
 
-				# Detailed record of exported files
-				for (texture_set, stack), files in result.textures.items():
-					substance_painter.logging.info(
-						f"[{PLUGIN_NAME}] Texture set '{texture_set}' -> {', '.join(files)}"
-					)
+				# Detailed record of exported files, in a single log entry
+				if self._log_verbose:
+					substance_painter.logging.info(f"[{PLUGIN_NAME}] Exported:\n" + "\n".join(lines))
 
 			elif result.status == substance_painter.export.ExportStatus.Warning:
-				self.status_action.setText("Status: Export completed with warnings")
+				self._set_status("Status: Export completed with warnings")
+				self._last_export_signature = export_signature
 				substance_painter.logging.warning(
 					f"[{PLUGIN_NAME}] {result.message}"
 				)
 
 			elif result.status == substance_painter.export.ExportStatus.Cancelled:
-				self.status_action.setText("Status: Export cancelled")
+				self._set_status("Status: Export cancelled")
+				self.forget_last_export()
 				substance_painter.logging.info(
 					f"[{PLUGIN_NAME}] Export cancelled by user"
 				)
 
 			else:
-				self.status_action.setText(f"Status: Export failed")
+				self._set_status(f"Status: Export failed")
+				self.forget_last_export()
 				substance_painter.logging.error(
 					f"[{PLUGIN_NAME}] Export failed: {result.message}"
 				)
-				
+
 		except Exception as e:
-			self.status_action.setText(f"Status: Export exception - {str(e)}")
-			substance_painter.logging.error(f"[{PLUGIN_NAME}] Exception occurred during export: {str(e)}")
+			self._set_status(f"Status: Export exception - {str(e)}")
+			self.forget_last_export()
+			substance_painter.logging.error(f"[{PLUGIN_NAME}] Exception occurred while reporting export result: {str(e)}")
+
+	def build_export_config(self, active_texture_set_name=None):
+		"""Build the export config for the given texture set, currently active texture set by default"""
+		if not substance_painter.project.is_open():
+			self._set_status("Status: No project open")
+			return None
 
-	def build_export_config(self):
 		try:
 			# Get currently active texture set
 			try:
-				active_stack = substance_painter.textureset.get_active_stack()
-				active_texture_set = active_stack.material()
-				# TextureSet.name() will call deprecated method `_utility.make_callable()`, so we hack it
-				# active_texture_set_name = active_texture_set.name()
-				active_texture_set_name = _substance_painter.textureset.material_name(active_texture_set.material_id)
+				if active_texture_set_name is None:
+					active_texture_set_name = self._active_texture_set_name()
 
 				if not active_texture_set_name:
 					substance_painter.logging.warning(f"[{PLUGIN_NAME}] Currently active texture set has no name")
-					self.status_action.setText("Status: Current texture set has no name")
+					self._set_status("Status: Current texture set has no name")
 					return
 
 				# Build export list, only including currently active texture set
@@ -205,114 +410,283 @@ class ExportOnSaveMenu(QtWidgets.QMenu):
 
 			except Exception as e:
 				substance_painter.logging.error(f"[{PLUGIN_NAME}] Error getting currently active texture set: {str(e)}")
-				self.status_action.setText("Status: Failed to get current texture set")
+				self._set_status("Status: Failed to get current texture set")
 				return
 
-			# Get current export path
-			export_path = substance_painter.js.evaluate("alg.mapexport.exportPath()")
+			# Get current export path, export settings and export preset in a single javascript round-trip
+			export_query_json = _get_js().evaluate(_EXPORT_QUERY_JS)
+
+			# Reuse the last config if the export settings have not changed, only swapping the export list
+			if self._cfg_cache is not None and self._cfg_key == export_query_json:
+				if self._cfg_cache["exportList"] != export_list:
+					self._cfg_cache = {**self._cfg_cache, "exportList": export_list}
+				return self._cfg_cache
+
+			export_query = _loads(export_query_json)
+			export_options = export_query["o"]
 
-			# Get current export settings
-			export_fileFormat = substance_painter.js.evaluate("alg.mapexport.getProjectExportOptions().fileFormat")
-			export_padding = substance_painter.js.evaluate("alg.mapexport.getProjectExportOptions().padding").lower()
-			export_dilation = substance_painter.js.evaluate("alg.mapexport.getProjectExportOptions().dilation")
-			export_bitDepth = substance_painter.js.evaluate("alg.mapexport.getProjectExportOptions().bitDepth")
-			export_exportShaderParams = substance_painter.js.evaluate("alg.mapexport.getProjectExportOptions().exportShaderParams")
+			export_path = export_query["path"]
+			export_fileFormat = export_options["fileFormat"]
+			export_padding = export_options["padding"].lower()
+			export_dilation = export_options["dilation"]
+			export_bitDepth = export_options["bitDepth"]
+			export_exportShaderParams = export_options["exportShaderParams"]
 
 			if export_padding == "infinite" or export_padding == "passthrough":
 				export_dithering = False
 			else:
 				export_dithering = True
 
-
-			# Get current export preset
-			export_preset = substance_painter.js.evaluate("alg.mapexport.getProjectExportPreset()")
-			
-			# Build export configuration
-			export_config = {
-				"exportShaderParams": export_exportShaderParams,
-				"defaultExportPreset": export_preset,
-				"exportPath": export_path,
-				"exportList": export_list,
-				"exportParameters": [{
-					"parameters": {
-						"fileFormat": export_fileFormat,
-						"bitDepth": str(export_bitDepth),
-						"dithering": export_dithering,
-						"paddingAlgorithm": export_padding,
-						"dilationDistance": export_dilation,
-					}
-				}]
-			}
+			export_preset = export_query["preset"]
+
+			# Build export configuration from the template, only filling the dynamic fields
+			export_config = {**self._CFG_TEMPLATE}
+			export_parameters = {**self._CFG_TEMPLATE["exportParameters"][0]["parameters"]}
+			export_config["exportParameters"] = [{"parameters": export_parameters}]
+
+			export_config["exportShaderParams"] = export_exportShaderParams
+			export_config["defaultExportPreset"] = export_preset
+			export_config["exportPath"] = export_path
+			export_config["exportList"] = export_list
+			export_parameters["fileFormat"] = export_fileFormat
+			export_parameters["bitDepth"] = str(export_bitDepth)
+			export_parameters["dithering"] = export_dithering
+			export_parameters["paddingAlgorithm"] = export_padding
+			export_parameters["dilationDistance"] = export_dilation
 		except Exception as e:
 			substance_painter.logging.error(f"[{PLUGIN_NAME}] Failed to build export config: {str(e)}")
 			return
+
+		self._cfg_key = export_query_json
+		self._cfg_cache = export_config
 		return export_config
+
+	def _active_texture_set_name(self):
+		"""Get the name of currently active texture set"""
+		active_stack = substance_painter.textureset.get_active_stack()
+		active_texture_set = active_stack.material()
+		# TextureSet.name() will call deprecated method `_utility.make_callable()`, so we hack it
+		# active_texture_set_name = active_texture_set.name()
+		active_texture_set_name = _substance_painter.textureset.material_name(active_texture_set.material_id)
+		return active_texture_set_name
+
+	def invalidate_export_config(self):
+		"""Drop the cached export config so the next build rebuilds it from scratch"""
+		self._cfg_key = None
+		self._cfg_cache = None
+
+	def remember_project_state(self):
+		"""Record whether the project currently has unsaved changes"""
+		self._project_modified = substance_painter.project.needs_saving()
+
+	def forget_last_export(self):
+		"""Make the next export run even if nothing changed
+		Also used after an export that did not complete, so its changes are exported on the next save
+		"""
+		self._last_export_signature = None
+		self._project_modified = True
 	
 	def load_settings(self):
 		"""Load settings"""
 		try:
-			settings_path = os.path.join(
-				os.path.dirname(__file__),
-				SETTINGS_FILE
-			)
+			try:
+				mtime_ns = os.stat(SETTINGS_PATH).st_mtime_ns
+			except FileNotFoundError:
+				self._migrate_legacy_settings()
+				return
 
-			if os.path.exists(settings_path):
-				with open(settings_path, 'r', encoding='utf-8') as f:
-					settings = json.load(f)
+			# Parsed settings are shared between instances until the file changes on disk
+			global _SETTINGS_CACHE
+			if _SETTINGS_CACHE is not None and _SETTINGS_CACHE[0] == mtime_ns:
+				settings = _SETTINGS_CACHE[1]
+			else:
+				with open(SETTINGS_PATH, 'rb') as f:
+					settings = _unpack_settings(f.read())
+				_SETTINGS_CACHE = (mtime_ns, settings)
 
-				self.enabled = settings.get('enabled', False)
+			self.enabled = settings.get('enabled', False)
+			self._last_saved_enabled = self.enabled
 
 		except Exception as e:
 			substance_painter.logging.warning(f"[{PLUGIN_NAME}] Failed to load settings: {str(e)}")
+
+	def _migrate_legacy_settings(self):
+		"""Load settings from the old JSON settings file, then rewrite them in the binary format"""
+		try:
+			with open(LEGACY_SETTINGS_PATH, 'rb') as f:
+				settings = _loads(f.read())
+		except FileNotFoundError:
+			return
+
+		self.enabled = settings.get('enabled', False)
+		self._flush_settings()
+		# Keep the old file around if the new one could not be written
+		if os.path.exists(SETTINGS_PATH):
+			os.remove(LEGACY_SETTINGS_PATH)
+			substance_painter.logging.info(f"[{PLUGIN_NAME}] Migrated settings to {SETTINGS_FILE}")
 	
 	def save_settings(self):
-		"""Save settings"""
+		"""Save settings
+		The write is deferred so that a burst of changes ends up in a single write
+		"""
+		self._settings_dirty = True
+		self._save_timer.start()
+
+	def flush_settings(self):
+		"""Write pending settings now, if any"""
+		self._save_timer.stop()
+		if self._settings_dirty:
+			self._flush_settings()
+
+	def _flush_settings(self):
+		"""Write settings to disk now, skipping the write if the file already holds them"""
+		global _SETTINGS_CACHE
+		self._settings_dirty = False
+		if self.enabled == self._last_saved_enabled:
+			return
+
 		try:
 			settings = {
 				'enabled': self.enabled
 			}
+			payload = _pack_settings(settings)
 
-			settings_path = os.path.join(
-				os.path.dirname(__file__),
-				SETTINGS_FILE
-			)
+			try:
+				mtime_ns = os.stat(SETTINGS_PATH).st_mtime_ns
+			except FileNotFoundError:
+				mtime_ns = None
+
+			if mtime_ns is not None:
+				if _SETTINGS_CACHE is not None and _SETTINGS_CACHE[0] == mtime_ns:
+					# The file has not changed since we last read or wrote it, no need to read it again
+					if _SETTINGS_CACHE[1] == settings:
+						return
+				elif Path(SETTINGS_PATH).read_bytes() == payload:
+					return
+
+			# Write to a temporary file then swap it in, so a crash never leaves a truncated settings file
+			tmp_path = SETTINGS_PATH + ".tmp"
+			with open(tmp_path, 'wb') as f:
+				f.write(payload)
+			os.replace(tmp_path, SETTINGS_PATH)
 
-			with open(settings_path, 'w', encoding='utf-8') as f:
-				json.dump(settings, f, indent=2, ensure_ascii=False)
+			_SETTINGS_CACHE = (os.stat(SETTINGS_PATH).st_mtime_ns, settings)
+			self._last_saved_enabled = self.enabled
 
 		except Exception as e:
 			substance_painter.logging.warning(f"[{PLUGIN_NAME}] Failed to save settings: {str(e)}")
 
 
+def _pack_settings(settings):
+	"""Encode settings as a single flags byte"""
+	return struct.pack('<B', int(settings['enabled']))
+
+def _unpack_settings(data):
+	"""Decode settings written by _pack_settings()"""
+	if not data:
+		return {}
+	return {'enabled': bool(data[0])}
+
+
 # Global variables
 export_menu = None
+# Whether the event listeners are registered, so that a save never triggers more than one export
+_CONNECTED = False
+# ProjectSaved events arriving within this many seconds after the last auto export are treated as the same save
+SAVE_COALESCE_WINDOW = 0.15
+# time.monotonic() when the last auto export ended
+_last_auto_export_end = None
 
 def on_project_saved(event):
 	"""Project saved event handler"""
-	global export_menu
+	global export_menu, _last_auto_export_end
 
-	if export_menu and export_menu.enabled:
-		substance_painter.logging.info(f"[{PLUGIN_NAME}] Auto export started on project saved")
+	# Leave the project lock alone unless there is something to export
+	if not (export_menu and export_menu.enabled and substance_painter.project.is_open()):
+		return
+
+	# Coalesce bursts of ProjectSaved into the first one
+	if _last_auto_export_end is not None and time.monotonic() - _last_auto_export_end < SAVE_COALESCE_WINDOW:
+		substance_painter.logging.info(f"[{PLUGIN_NAME}] Auto export skipped - already exported for this save")
+		return
+
+	try:
 		with _ActionUnlock():
+			substance_painter.logging.info(f"[{PLUGIN_NAME}] Auto export started on project saved")
 			export_menu.execute_export()
-		substance_painter.logging.info(f"[{PLUGIN_NAME}] Auto export completed")
+			substance_painter.logging.info(f"[{PLUGIN_NAME}] Auto export completed")
+	finally:
+		_last_auto_export_end = time.monotonic()
+
+def on_project_changed(event):
+	"""Project opened/closed event handler"""
+	global export_menu
+
+	if export_menu:
+		export_menu.invalidate_export_config()
+		export_menu.forget_last_export()
+
+def on_project_about_to_save(event):
+	"""Project about to save event handler"""
+	global export_menu
+
+	if export_menu:
+		# The project is always clean once saved, so record its state before saving
+		export_menu.remember_project_state()
+
+# (event type, handler) pairs registered while the plugin runs
+_EVENT_HANDLERS = (
+	# Export on project saved
+	(substance_painter.event.ProjectSaved, on_project_saved),
+	(substance_painter.event.ProjectAboutToSave, on_project_about_to_save),
+	# Invalidate the cached export config on project opened/closed
+	(substance_painter.event.ProjectEditionEntered, on_project_changed),
+	(substance_painter.event.ProjectAboutToClose, on_project_changed),
+)
+
+def _connect_events():
+	"""Register event listeners, start_plugin() guards against registering twice"""
+	global _CONNECTED
+
+	for event_type, handler in _EVENT_HANDLERS:
+		substance_painter.event.DISPATCHER.connect(event_type, handler)
+	_CONNECTED = True
+
+def _disconnect_events():
+	"""Unregister event listeners, if registered
+	A handler that fails to disconnect does not keep the others connected,
+	nor does it prevent the plugin from being started again.
+	"""
+	global _CONNECTED
+
+	if not _CONNECTED:
+		return
+
+	for event_type, handler in _EVENT_HANDLERS:
+		try:
+			substance_painter.event.DISPATCHER.disconnect(event_type, handler)
+		except Exception as e:
+			substance_painter.logging.warning(f"[{PLUGIN_NAME}] Failed to disconnect {handler.__name__}: {str(e)}")
+	_CONNECTED = False
 
 def start_plugin():
 	"""Start plugin"""
 	global export_menu
 
+	if _CONNECTED:
+		substance_painter.logging.warning(f"[{PLUGIN_NAME}] Plugin already started")
+		return
+
 	try:
-		# Create plugin menu
-		export_menu = ExportOnSaveMenu()
+		# Create plugin menu, reusing the one left by a previous start that did not complete
+		if export_menu is None:
+			export_menu = ExportOnSaveMenu()
 
-		# Add menu to application
-		substance_painter.ui.add_menu(export_menu)
+			# Add menu to application
+			substance_painter.ui.add_menu(export_menu)
 		
-		# Register project saved event listener
-		substance_painter.event.DISPATCHER.connect(
-			substance_painter.event.ProjectSaved,
-			on_project_saved
-		)
+		# Register event listeners
+		_connect_events()
 		
 		substance_painter.logging.info(f"[{PLUGIN_NAME}] Plugin started successfully")
 		
@@ -324,11 +698,12 @@ def close_plugin():
 	global export_menu
 
 	try:
-		# Disconnect event listener
-		substance_painter.event.DISPATCHER.disconnect(
-			substance_painter.event.ProjectSaved,
-			on_project_saved
-		)
+		# Write pending settings first, so they survive whatever fails below
+		if export_menu:
+			export_menu.flush_settings()
+
+		# Disconnect event listeners
+		_disconnect_events()
 
 		# Clean up menu
 		if export_menu: